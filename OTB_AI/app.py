@@ -1,6 +1,7 @@
 import os
 from dotenv import load_dotenv
 from fastapi import FastAPI, Query
+from starlette.concurrency import run_in_threadpool
 from src.main import (
     hybrid_search,
     build_prompt,
@@ -45,26 +46,33 @@ def root():
 
 
 @app.get("/get_tweets_inspo", tags=["Tweet Search"])
-def search_tweets(
+async def search_tweets(
     query_lat: float = Query(..., description="Latitude of the location"),
     query_lon: float = Query(..., description="Longitude of the location"),
     collection_name: str = Query("tweets_collection", description="Qdrant collection name"),
     topic: str | None = Query(None, description="Enter a topic of choice"),
-    radius_km: float | None = Query(None, description="Radius of choice")
+    radius_km: float | None = Query(None, description="Radius of choice"),
+    half_life_hours: float = Query(24.0, gt=0, description="Hours after which a tweet's recency boost halves"),
+    recency_weight: float = Query(0.3, ge=0, le=1, description="Blend weight of recency vs. vector similarity"),
+    max_age_hours: float | None = Query(None, gt=0, description="Ignore tweets older than this many hours")
 ):
     """
     Perform a hybrid search of tweets based on query text and location,
     then summarize results with Mistral into a structured JSON response.
     """
 
-    # Step 1: Perform hybrid semantic + location search
-    results = hybrid_search(
+    # Step 1: Perform hybrid semantic + location search (blocking Qdrant/embedding calls -> threadpool)
+    results = await run_in_threadpool(
+        hybrid_search,
         client=qdrant_client,
         query_lat=query_lat,
         query_lon=query_lon,
         collection_name=collection_name,
         text_query=topic,
-        radius_km=radius_km
+        radius_km=radius_km,
+        half_life_hours=half_life_hours,
+        recency_weight=recency_weight,
+        max_age_hours=max_age_hours
     )
 
     tweets = extract_documents(results)
@@ -74,8 +82,8 @@ def search_tweets(
     # Step 3: Build prompt for Mistral
     prompt = build_prompt(context_text)
 
-    # Step 4: Get structured JSON response from Mistral
-    result = get_llm_response(prompt, context_text)
+    # Step 4: Get structured JSON response from Mistral (hedged with OpenAI, runs on the event loop)
+    result = await get_llm_response(prompt, context_text)
 
     return {
     "tweets": tweets,
@@ -0,0 +1,179 @@
+"""
+Offline embedding artifacts: embed the tweet dataset once, reload it anywhere.
+
+Layout (one directory per model + version):
+
+    <root>/<model_slug>/<version>/
+        vectors.npy     float32 matrix (n, dim), opened with mmap
+        points.jsonl    one {"id", "payload"} per row, same order as vectors.npy
+        manifest.json   model name, dim, count, distance, source, created_at
+
+Building streams the JSONL with the same parsing/ids as the resumable upload
+(src/embeddings/text_embeddings.py), so a collection loaded from an artifact is
+identical to one built by `embed_and_upload_in_chunks_resumable`.
+"""
+import json
+import os
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Dict, Iterator, Optional, Tuple
+
+import numpy as np
+
+from src.embeddings.text_embeddings import stream_jsonl
+from src.indexing.temporal_decay import TIMESTAMP_FIELD
+
+DEFAULT_ARTIFACT_ROOT = "artifacts/embeddings"
+VECTORS_FILE = "vectors.npy"
+POINTS_FILE = "points.jsonl"
+MANIFEST_FILE = "manifest.json"
+
+
+def model_slug(model_name: str) -> str:
+    """Filesystem-safe directory name for a model, e.g. BAAI/bge-small-en-v1.5 -> BAAI__bge-small-en-v1.5."""
+    return model_name.replace("/", "__")
+
+
+def artifact_path(root: str, model_name: str, version: str) -> str:
+    return os.path.join(root, model_slug(model_name), version)
+
+
+def latest_version(root: str, model_name: str) -> Optional[str]:
+    """Most recently built complete artifact version for the model, by the manifest's created_at."""
+    model_dir = os.path.join(root, model_slug(model_name))
+    if not os.path.isdir(model_dir):
+        return None
+    built = []
+    for v in os.listdir(model_dir):
+        manifest_path = os.path.join(model_dir, v, MANIFEST_FILE)
+        if not os.path.exists(manifest_path):
+            continue
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            built.append((json.load(f).get("created_at", ""), v))
+    return max(built)[1] if built else None
+
+
+@dataclass
+class EmbeddingArtifact:
+    path: str
+    manifest: Dict
+    vectors: np.ndarray  # read-only memmap, shape (count, dim)
+
+    @property
+    def model_name(self) -> str:
+        return self.manifest["model_name"]
+
+    @property
+    def dim(self) -> int:
+        return int(self.manifest["dim"])
+
+    def __len__(self) -> int:
+        return int(self.manifest["count"])
+
+    def iter_points(self) -> Iterator[Tuple[int, Dict]]:
+        """Yield (id, payload) in row order."""
+        with open(os.path.join(self.path, POINTS_FILE), "r", encoding="utf-8") as f:
+            for raw in f:
+                item = json.loads(raw)
+                yield item["id"], item["payload"]
+
+    def ids(self) -> Iterator[int]:
+        return (point_id for point_id, _ in self.iter_points())
+
+    def payloads(self) -> Iterator[Dict]:
+        return (payload for _, payload in self.iter_points())
+
+
+# ------------------------------
+# Build
+# ------------------------------
+def build_embedding_artifact(
+    jsonl_file_path: str,
+    root: str = DEFAULT_ARTIFACT_ROOT,
+    model_name: str = "BAAI/bge-small-en-v1.5",
+    version: Optional[str] = None,
+    chunk_size: int = 500,
+    embedding_model=None,
+) -> EmbeddingArtifact:
+    """
+    Embed every tweet in `jsonl_file_path` and persist it as a versioned artifact.
+    `version` defaults to the current UTC time; `embedding_model` defaults to fastembed's TextEmbedding.
+    """
+    if embedding_model is None:
+        from fastembed import TextEmbedding
+        embedding_model = TextEmbedding(model_name=model_name)
+
+    version = version or datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    path = artifact_path(root, model_name, version)
+    if os.path.exists(os.path.join(path, MANIFEST_FILE)):
+        raise FileExistsError(f"Artifact already exists: {path}")
+    os.makedirs(path, exist_ok=True)
+
+    # first pass only parses JSON, so sizing the matrix up front is cheap next to embedding
+    count = sum(1 for _ in stream_jsonl(jsonl_file_path))
+    dim = len(list(embedding_model.embed(["hello"]))[0])
+    vectors = np.lib.format.open_memmap(
+        os.path.join(path, VECTORS_FILE), mode="w+", dtype=np.float32, shape=(count, dim)
+    )
+
+    row = 0
+    docs = []
+    with open(os.path.join(path, POINTS_FILE), "w", encoding="utf-8") as points_f:
+        def flush(out: np.ndarray):
+            nonlocal row, docs
+            if not docs:
+                return
+            embedded = np.asarray(list(embedding_model.embed(docs)), dtype=np.float32)
+            out[row:row + len(docs)] = embedded
+            row += len(docs)
+            print(f"🧮 Embedded {row}/{count}")
+            docs = []
+
+        for line_no, text, lat, lon, timestamp in stream_jsonl(jsonl_file_path):
+            docs.append(text)
+            payload = {"document": text, "latitude": lat, "longitude": lon, TIMESTAMP_FIELD: timestamp}
+            points_f.write(json.dumps({"id": int(line_no), "payload": payload}, ensure_ascii=False) + "\n")
+            if len(docs) >= chunk_size:
+                flush(vectors)
+        flush(vectors)
+
+    vectors.flush()
+
+    manifest = {
+        "model_name": model_name,
+        "version": version,
+        "dim": dim,
+        "count": count,
+        "dtype": "float32",
+        "distance": "Cosine",
+        "source": os.path.abspath(jsonl_file_path),
+        "created_at": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+    }
+    # manifest is written last: its presence marks the artifact as complete
+    with open(os.path.join(path, MANIFEST_FILE), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    print(f"✅ Artifact written to {path} ({count} x {dim})")
+    return load_embedding_artifact(root, model_name, version)
+
+
+# ------------------------------
+# Load
+# ------------------------------
+def load_embedding_artifact(
+    root: str = DEFAULT_ARTIFACT_ROOT,
+    model_name: str = "BAAI/bge-small-en-v1.5",
+    version: Optional[str] = None,
+) -> EmbeddingArtifact:
+    """Open an artifact (latest version if `version` is None); vectors are memory-mapped, not read."""
+    version = version or latest_version(root, model_name)
+    if version is None:
+        raise FileNotFoundError(f"No embedding artifact for {model_name} under {root}")
+    path = artifact_path(root, model_name, version)
+    with open(os.path.join(path, MANIFEST_FILE), "r", encoding="utf-8") as f:
+        manifest = json.load(f)
+    if manifest["model_name"] != model_name:
+        raise ValueError(f"Artifact at {path} was built with {manifest['model_name']}, not {model_name}")
+    vectors = np.load(os.path.join(path, VECTORS_FILE), mmap_mode="r")
+    if vectors.shape != (manifest["count"], manifest["dim"]):
+        raise ValueError(f"Artifact at {path} is inconsistent: vectors {vectors.shape} vs manifest")
+    return EmbeddingArtifact(path=path, manifest=manifest, vectors=vectors)
@@ -0,0 +1,150 @@
+"""
+Micro-batching of query embeddings across concurrent requests.
+
+- Callers hand a single text to `EmbeddingBatcher.embed` and block on its vector
+- A worker thread collects texts arriving within `max_wait_ms` (up to `max_batch_size`)
+  and runs ONE `model.embed(batch)` call for all of them
+- `get_query_embedder` returns a process-wide batcher per model, configured via
+  EMBED_BATCH_WINDOW_MS / EMBED_MAX_BATCH_SIZE; callers wait at most
+  QUERY_EMBED_TIMEOUT_S (EMBED_TIMEOUT_S) for their vector
+- The default window/batch size are provisional; tune them with
+  `python -m src.utils.benchmark_embedding_batching`
+"""
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+DEFAULT_MODEL_NAME = "BAAI/bge-small-en-v1.5"
+QUERY_EMBED_TIMEOUT_S = float(os.getenv("EMBED_TIMEOUT_S", "30"))
+
+_STOP = object()
+
+
+class EmbeddingBatcher:
+    """
+    Coalesce single-text embed requests into batched `model.embed` calls.
+    `model` is anything with `embed(list_of_texts) -> iterable of vectors` (e.g. fastembed TextEmbedding).
+    """
+
+    def __init__(self, model, max_batch_size: int = 32, max_wait_ms: float = 3.0):
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be >= 1")
+        self.model = model
+        self.max_batch_size = max_batch_size
+        self.max_wait_s = max_wait_ms / 1000.0
+        self._queue: "queue.Queue" = queue.Queue()
+        self._closed = False
+        self._close_lock = threading.Lock()
+        self._worker = threading.Thread(target=self._loop, name="embedding-batcher", daemon=True)
+        self._worker.start()
+
+    # ------------------------------
+    # Public API
+    # ------------------------------
+    def submit(self, text: str) -> Future:
+        """Queue a text; the returned future resolves to its embedding (np.ndarray)."""
+        fut: Future = Future()
+        # under the lock, so nothing can be queued behind the stop marker
+        with self._close_lock:
+            if self._closed:
+                raise RuntimeError("EmbeddingBatcher is closed")
+            self._queue.put((text, fut))
+        return fut
+
+    def embed(self, text: str, timeout: Optional[float] = None) -> np.ndarray:
+        """Embed a single text, sharing the model call with concurrent callers."""
+        fut = self.submit(text)
+        try:
+            return fut.result(timeout=timeout)
+        except FutureTimeoutError:
+            fut.cancel()  # not embedded yet -> the worker will skip it
+            raise
+
+    def close(self) -> None:
+        """Stop the worker after flushing texts already queued."""
+        with self._close_lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._queue.put(_STOP)
+        self._worker.join()
+
+    # ------------------------------
+    # Worker
+    # ------------------------------
+    def _loop(self) -> None:
+        stop = False
+        while not stop:
+            batch: List[Tuple[str, Future]] = []
+            try:
+                stop = self._collect(batch)
+                if batch:
+                    self._run_batch(batch)
+            except Exception as e:
+                # never let the worker die: that would leave every later caller hanging
+                for _, fut in batch:
+                    if not fut.done():
+                        fut.set_exception(e)
+
+    def _collect(self, batch: List[Tuple[str, Future]]) -> bool:
+        """Fill `batch` with live requests from one window; return True once stopped."""
+        item = self._queue.get()
+        if item is _STOP:
+            return True
+        self._take(item, batch)
+        deadline = time.monotonic() + self.max_wait_s
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                return False
+            if item is _STOP:
+                return True
+            self._take(item, batch)
+        return False
+
+    @staticmethod
+    def _take(item: Tuple[str, Future], batch: List[Tuple[str, Future]]) -> None:
+        # callers may cancel their future while it waits; cancelled ones are dropped here
+        if item[1].set_running_or_notify_cancel():
+            batch.append(item)
+
+    def _run_batch(self, batch: List[Tuple[str, Future]]) -> None:
+        texts = [text for text, _ in batch]
+        try:
+            vectors = list(self.model.embed(texts))
+            if len(vectors) != len(texts):
+                raise RuntimeError(f"model returned {len(vectors)} vectors for {len(texts)} texts")
+        except Exception as e:
+            for _, fut in batch:
+                fut.set_exception(e)
+            return
+        for (_, fut), vec in zip(batch, vectors):
+            fut.set_result(np.asarray(vec))
+
+
+# ------------------------------
+# Shared per-model batchers
+# ------------------------------
+_batchers: Dict[str, EmbeddingBatcher] = {}
+_batchers_lock = threading.Lock()
+
+
+def get_query_embedder(model_name: str = DEFAULT_MODEL_NAME) -> EmbeddingBatcher:
+    """Return the process-wide batcher for `model_name`, loading the model on first use."""
+    with _batchers_lock:
+        if model_name not in _batchers:
+            from fastembed import TextEmbedding
+
+            _batchers[model_name] = EmbeddingBatcher(
+                TextEmbedding(model_name=model_name),
+                max_batch_size=int(os.getenv("EMBED_MAX_BATCH_SIZE", "32")),
+                max_wait_ms=float(os.getenv("EMBED_BATCH_WINDOW_MS", "3")),
+            )
+        return _batchers[model_name]
@@ -5,12 +5,18 @@ Chunked, resumable embed + upload to Qdrant.
 - Uses integer point IDs = JSONL line numbers (1-based)
 - Writes progress to .upload_checkpoint.json so you can resume
 - Retries uploads with exponential backoff on transient failures
+- Stores an indexed RFC 3339 `timestamp` payload used for recency-decayed ranking
+
+Run from the OTB_AI directory as a module (it imports from `src.`):
+
+    python -m src.embeddings.text_embeddings
 """
 import json
 import math
 import os
 import time
 import random
+from datetime import datetime, timezone
 from typing import Iterator, Tuple, List, Dict, Optional
 
 import numpy as np
@@ -18,6 +24,17 @@ from qdrant_client import QdrantClient, models
 from fastembed import TextEmbedding
 from dotenv import load_dotenv
 
+from src.embeddings.embedding_batcher import QUERY_EMBED_TIMEOUT_S, get_query_embedder
+from src.indexing.temporal_decay import (
+    TIMESTAMP_FIELD,
+    build_time_window_filter,
+    ensure_timestamp_index,
+    ensure_timestamp_index_once,
+    parse_timestamp,
+    recency_query_kwargs,
+    to_rfc3339,
+)
+
 load_dotenv()
 
 CHECKPOINT_FILE = ".upload_checkpoint.json"
@@ -55,11 +72,13 @@ def write_checkpoint(collection_name: str, last_line: int) -> None:
 # ------------------------------
 # Stream JSONL tweets lazily
 # ------------------------------
-def stream_jsonl(file_path: str, start_line: int = 1) -> Iterator[Tuple[int, str, float, float]]:
+def stream_jsonl(file_path: str, start_line: int = 1) -> Iterator[Tuple[int, str, float, float, str]]:
     """
-    Yield (line_number, text, latitude, longitude).
+    Yield (line_number, text, latitude, longitude, timestamp).
     start_line: skip lines < start_line (1-based)
+    timestamp: RFC 3339 string from the tweet's `created_at`/`timestamp`, or the ingest time
     """
+    ingested_at = to_rfc3339(datetime.now(timezone.utc))
     with open(file_path, "r", encoding="utf-8") as f:
         for idx, raw in enumerate(f, start=1):
             if idx < start_line:
@@ -87,7 +106,8 @@ def stream_jsonl(file_path: str, start_line: int = 1) -> Iterator[Tuple[int, str
                     lon = float(coords[1])
                 except Exception:
                     continue
-            yield idx, text, lat, lon
+            timestamp = parse_timestamp(item.get("created_at") or item.get("timestamp")) or ingested_at
+            yield idx, text, lat, lon, timestamp
 
 
 # ------------------------------
@@ -110,6 +130,8 @@ def ensure_collection(client: QdrantClient, collection_name: str, vector_dim: in
         client.create_payload_index(collection_name=collection_name, field_name="longitude", field_schema=models.FloatIndexParams())
     except Exception:
         pass
+    # datetime index backs the time-window prefilter in hybrid_search
+    ensure_timestamp_index(client, collection_name)
 
 
 # ------------------------------
@@ -169,9 +191,9 @@ def embed_and_upload_in_chunks_resumable(
     processed_count = last_processed
     chunk_id = 0
 
-    for line_no, text, lat, lon in stream_jsonl(jsonl_file_path, start_line=start_line):
+    for line_no, text, lat, lon, timestamp in stream_jsonl(jsonl_file_path, start_line=start_line):
         docs.append(text)
-        payloads.append({"document": text, "latitude": lat, "longitude": lon})
+        payloads.append({"document": text, "latitude": lat, "longitude": lon, TIMESTAMP_FIELD: timestamp})
         ids.append(int(line_no))  # integer id = line number
 
         if len(docs) >= chunk_size:
@@ -221,7 +243,11 @@ def hybrid_search(
     text_query: Optional[str] = None,
     radius_km: float = 50,
     top_k: int = 5,
-    candidate_limit: int = 1000
+    candidate_limit: int = 1000,
+    half_life_hours: float = 24.0,
+    recency_weight: float = 0.3,
+    max_age_hours: Optional[float] = None,
+    decay: str = "exp",
 ):
     """
     Alternative hybrid search that does spatial filtering *client-side* to avoid server-side
@@ -232,19 +258,33 @@ def hybrid_search(
     - If text_query is None: scroll a batch of points (limit=candidate_limit), compute haversine,
         pick nearest top_k by distance, compute centroid of their vectors (if available), and then
         run a query_points by centroid to get textually-similar results (same as before).
+
+    Vector queries are ranked inside Qdrant by a recency-decayed score (see
+    src/indexing/temporal_decay.py): `recency_weight` blends a `decay` ("exp" or "gauss")
+    curve with vector similarity, halving every `half_life_hours`. If `max_age_hours` is set,
+    older tweets are filtered out before scoring (the datetime index that filter needs is
+    created on first use; tweets without a timestamp never pass it). `recency_weight=0`
+    ranks by similarity only.
     """
+    recency = dict(
+        half_life_hours=half_life_hours,
+        recency_weight=recency_weight,
+        max_age_hours=max_age_hours,
+        decay=decay,
+    )
+    if max_age_hours is not None:
+        ensure_timestamp_index_once(client, collection_name)
+
     # PATH A: text query provided -> vector candidates then client-side spatial filter
     if text_query and text_query.strip():
-        embedding_model = TextEmbedding(model_name="BAAI/bge-small-en-v1.5")
-        embeddings = list(embedding_model.embed([text_query]))
-        qvec = embeddings[0]
-        # get many candidate vector hits (no server-side geo filter)
+        # shared model; concurrent requests are coalesced into one batched embed call
+        qvec = get_query_embedder("BAAI/bge-small-en-v1.5").embed(text_query, timeout=QUERY_EMBED_TIMEOUT_S)
+        # candidate vector hits ranked by the recency-decayed score (no server-side geo filter)
         resp = client.query_points(
             collection_name=collection_name,
-            query=qvec,
-            limit=candidate_limit,
             with_payload=True,
-            with_vectors=False
+            with_vectors=False,
+            **recency_query_kwargs(qvec, limit=candidate_limit, candidate_limit=candidate_limit, **recency),
         )
         candidates = resp.points
 
@@ -259,23 +299,25 @@ def hybrid_search(
             if dist_km <= radius_km:
                 filtered.append((p, dist_km))
 
-        # sort by score (if present) else by distance, and return top_k
-        filtered.sort(key=lambda x: (-(getattr(x[0], "score", 0) or 0), x[1]))
+        # points already come back ranked by Qdrant; keep that order and return top_k
         out = []
         for p, dist in filtered[:top_k]:
             out.append({
                 "document": p.payload.get("document"),
                 "latitude": p.payload.get("latitude"),
                 "longitude": p.payload.get("longitude"),
+                TIMESTAMP_FIELD: p.payload.get(TIMESTAMP_FIELD),
                 "score": getattr(p, "score", None),
                 "distance_km": dist
             })
         return out
 
-    # PATH B: no text -> fetch candidates by scrolling (no server filter), compute distances locally
-    # NOTE: scroll without server filter avoids the index error
+    # PATH B: no text -> fetch candidates by scrolling, compute distances locally
+    # NOTE: no server-side geo filter (lat/lon may lack payload indexes); the only server filter
+    # is the optional time window, whose datetime index is ensured above
     scroll_resp = client.scroll(
         collection_name=collection_name,
+        scroll_filter=build_time_window_filter(max_age_hours),
         limit=candidate_limit,
         with_payload=True,
         with_vectors=True
@@ -311,6 +353,7 @@ def hybrid_search(
             "document": p.payload.get("document"),
             "latitude": p.payload.get("latitude"),
             "longitude": p.payload.get("longitude"),
+            TIMESTAMP_FIELD: p.payload.get(TIMESTAMP_FIELD),
             "distance_km": dist_km
         })
         if getattr(p, "vector", None) is not None:
@@ -322,10 +365,9 @@ def hybrid_search(
         centroid = np.mean(vecs_for_centroid, axis=0).tolist()
         resp = client.query_points(
             collection_name=collection_name,
-            query=centroid,
-            limit=top_k,
             with_payload=True,
-            with_vectors=False
+            with_vectors=False,
+            **recency_query_kwargs(centroid, limit=top_k, candidate_limit=candidate_limit, **recency),
         )
         for p in resp.points:
             lat = p.payload.get("latitude")
@@ -337,6 +379,7 @@ def hybrid_search(
                 "document": p.payload.get("document"),
                 "latitude": lat,
                 "longitude": lon,
+                TIMESTAMP_FIELD: p.payload.get(TIMESTAMP_FIELD),
                 "score": getattr(p, "score", None),
                 "distance_km": distance_km
             })
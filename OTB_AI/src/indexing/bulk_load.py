@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+"""
+Re-provision a tweets collection without re-embedding.
+
+- `bulk_load_collection`: build a collection from an offline embedding artifact
+  (src/embeddings/embedding_artifacts.py) with HNSW indexing deferred until all
+  points are in (`indexing_threshold=0` during upload, then the previous value again)
+- `create_collection_snapshot` / `download_collection_snapshot` / `restore_collection_snapshot`:
+  Qdrant snapshot round-trip, including moving the snapshot file to a new node
+
+    python -m src.indexing.bulk_load build --jsonl datasets/text_coordinates_regions.jsonl
+    python -m src.indexing.bulk_load load --collection tweets_collection
+    python -m src.indexing.bulk_load snapshot --collection tweets_collection --download snapshots/
+    python -m src.indexing.bulk_load restore --collection tweets_collection --location snapshots/<file>.snapshot
+"""
+import argparse
+import os
+from typing import Optional
+
+import httpx
+from dotenv import load_dotenv
+from qdrant_client import QdrantClient, models
+
+from src.embeddings.embedding_artifacts import (
+    DEFAULT_ARTIFACT_ROOT,
+    EmbeddingArtifact,
+    build_embedding_artifact,
+    load_embedding_artifact,
+)
+from src.embeddings.text_embeddings import ensure_collection, read_checkpoint, write_checkpoint
+
+load_dotenv()
+
+# Qdrant's default indexing_threshold (KB of vectors per segment before HNSW is built),
+# used when the collection config does not report one
+DEFAULT_INDEXING_THRESHOLD = 20000
+
+
+# ------------------------------
+# Bulk load from artifact
+# ------------------------------
+def bulk_load_collection(
+    client: QdrantClient,
+    collection_name: str,
+    artifact: EmbeddingArtifact,
+    batch_size: int = 1024,
+    parallel: int = 1,
+    recreate: bool = False,
+    indexing_threshold: Optional[int] = None,
+    checkpoint_source: Optional[str] = None,
+):
+    """
+    Upload every point of `artifact` into `collection_name`.
+
+    Indexing is disabled (`indexing_threshold=0`) so segments are not re-indexed while
+    points stream in. Afterwards the threshold goes back to the collection's previous value,
+    or to `indexing_threshold` if given; this also happens on failure, so a partial load is
+    never left unindexed. An existing collection must match the artifact's vector size and
+    distance.
+
+    If `checkpoint_source` is the JSONL the artifact was built from, the resumable upload
+    checkpoint is advanced to the artifact's last line (never moved backwards), so later
+    incremental runs of `embed_and_upload_in_chunks_resumable` on that file only pick up new
+    tweets. Line numbers from any other file mean nothing there, so the checkpoint is left alone.
+    """
+    distance = models.Distance(artifact.manifest.get("distance", "Cosine"))
+    if recreate and client.collection_exists(collection_name):
+        client.delete_collection(collection_name)
+        print(f"🗑️ Dropped collection '{collection_name}'")
+
+    if not client.collection_exists(collection_name):
+        client.create_collection(
+            collection_name=collection_name,
+            vectors_config=models.VectorParams(size=artifact.dim, distance=distance),
+        )
+        print(f"✅ Created collection '{collection_name}'")
+    info = client.get_collection(collection_name)
+    vectors = info.config.params.vectors
+    if not isinstance(vectors, models.VectorParams) or vectors.size != artifact.dim or vectors.distance != distance:
+        raise ValueError(
+            f"Collection '{collection_name}' has vectors {vectors!r}, artifact needs "
+            f"size={artifact.dim} distance={distance.value}; use recreate=True to rebuild it"
+        )
+
+    previous = info.config.optimizer_config.indexing_threshold
+    if indexing_threshold is None:
+        indexing_threshold = previous if previous is not None else DEFAULT_INDEXING_THRESHOLD
+    client.update_collection(
+        collection_name=collection_name,
+        optimizers_config=models.OptimizersConfigDiff(indexing_threshold=0),
+    )
+    print(f"⏸️ Indexing deferred (was indexing_threshold={previous})")
+    # payload indexes (lat/lon/timestamp) are cheap to build up front
+    ensure_collection(client, collection_name, vector_dim=artifact.dim)
+
+    print(f"🚀 Loading {len(artifact)} points from {artifact.path} ...")
+    try:
+        client.upload_collection(
+            collection_name=collection_name,
+            vectors=artifact.vectors,
+            payload=artifact.payloads(),
+            ids=artifact.ids(),
+            batch_size=batch_size,
+            parallel=parallel,
+            wait=True,
+        )
+    except Exception:
+        _restore_indexing_threshold(client, collection_name, indexing_threshold, raise_errors=False)
+        raise
+    _restore_indexing_threshold(client, collection_name, indexing_threshold, raise_errors=True)
+    print(f"🎉 Loaded {len(artifact)} points.")
+
+    if checkpoint_source is not None:
+        source = artifact.manifest.get("source")
+        if source != os.path.abspath(checkpoint_source):
+            print(f"⚠️ Checkpoint not updated: artifact was built from {source}, not {checkpoint_source}")
+            return
+        last_id = max(read_checkpoint(collection_name), max(artifact.ids(), default=0))
+        write_checkpoint(collection_name, last_id)
+        print(f"📍 checkpoint -> {last_id}")
+
+
+def _restore_indexing_threshold(client: QdrantClient, collection_name: str, indexing_threshold: int, raise_errors: bool):
+    """Put indexing back on; when an upload error is already propagating, only log a failure here."""
+    try:
+        client.update_collection(
+            collection_name=collection_name,
+            optimizers_config=models.OptimizersConfigDiff(indexing_threshold=indexing_threshold),
+        )
+    except Exception as e:
+        print(f"❌ Could not restore indexing_threshold={indexing_threshold} on '{collection_name}': {e}")
+        if raise_errors:
+            raise
+        return
+    print(f"🔧 Indexing restored (indexing_threshold={indexing_threshold})")
+
+
+# ------------------------------
+# Snapshots
+# ------------------------------
+def snapshot_url(qdrant_url: str, collection_name: str, snapshot_name: str) -> str:
+    """REST URL the snapshot can be downloaded (or recovered) from."""
+    return f"{qdrant_url.rstrip('/')}/collections/{collection_name}/snapshots/{snapshot_name}"
+
+
+def create_collection_snapshot(client: QdrantClient, collection_name: str, qdrant_url: Optional[str] = None) -> Optional[models.SnapshotDescription]:
+    """Take a snapshot of the collection on the Qdrant node and print where to fetch it."""
+    snapshot = client.create_snapshot(collection_name=collection_name, wait=True)
+    if snapshot is not None:
+        print(f"📸 Snapshot '{snapshot.name}' created ({snapshot.size} bytes, sha256 {snapshot.checksum})")
+        if qdrant_url:
+            print(f"   download: {snapshot_url(qdrant_url, collection_name, snapshot.name)}")
+    return snapshot
+
+
+def download_collection_snapshot(
+    qdrant_url: str,
+    api_key: Optional[str],
+    collection_name: str,
+    snapshot_name: str,
+    out_dir: str,
+) -> str:
+    """Stream a snapshot off the node to `out_dir`; returns the local file path."""
+    os.makedirs(out_dir, exist_ok=True)
+    out_path = os.path.join(out_dir, snapshot_name)
+    headers = {"api-key": api_key} if api_key else {}
+    url = snapshot_url(qdrant_url, collection_name, snapshot_name)
+    with httpx.stream("GET", url, headers=headers, timeout=None) as resp:
+        resp.raise_for_status()
+        with open(out_path, "wb") as f:
+            for chunk in resp.iter_bytes(chunk_size=1 << 20):
+                f.write(chunk)
+    print(f"💾 Snapshot saved to {out_path}")
+    return out_path
+
+
+def upload_collection_snapshot(
+    qdrant_url: str,
+    api_key: Optional[str],
+    collection_name: str,
+    snapshot_path: str,
+    checksum: Optional[str] = None,
+):
+    """Restore `collection_name` on the node at `qdrant_url` from a local snapshot file."""
+    headers = {"api-key": api_key} if api_key else {}
+    params = {"wait": "true", "priority": models.SnapshotPriority.SNAPSHOT.value}
+    if checksum:
+        params["checksum"] = checksum
+    url = f"{qdrant_url.rstrip('/')}/collections/{collection_name}/snapshots/upload"
+    with open(snapshot_path, "rb") as f:
+        resp = httpx.post(
+            url,
+            params=params,
+            headers=headers,
+            files={"snapshot": (os.path.basename(snapshot_path), f)},
+            timeout=None,
+        )
+    resp.raise_for_status()
+    print(f"✅ Restored '{collection_name}' from {snapshot_path}")
+
+
+def restore_collection_snapshot(
+    client: QdrantClient,
+    collection_name: str,
+    location: str,
+    api_key: Optional[str] = None,
+    checksum: Optional[str] = None,
+):
+    """
+    Restore `collection_name` from a snapshot URL or `file://` path visible to the Qdrant node
+    (for a file on this machine, use `upload_collection_snapshot`).
+    The snapshot's data wins over anything already in the collection.
+    """
+    client.recover_snapshot(
+        collection_name=collection_name,
+        location=location,
+        api_key=api_key,
+        checksum=checksum,
+        priority=models.SnapshotPriority.SNAPSHOT,
+        wait=True,
+    )
+    print(f"✅ Restored '{collection_name}' from {location}")
+
+
+# ------------------------------
+# CLI
+# ------------------------------
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("command", choices=["build", "load", "snapshot", "restore"])
+    parser.add_argument("--collection", default="tweets_collection")
+    parser.add_argument("--jsonl", default="datasets/text_coordinates_regions.jsonl")
+    parser.add_argument("--artifact-root", default=DEFAULT_ARTIFACT_ROOT)
+    parser.add_argument("--model-name", default="BAAI/bge-small-en-v1.5")
+    parser.add_argument("--version", default=None, help="artifact version (default: latest)")
+    parser.add_argument("--recreate", action="store_true", help="drop the collection before loading")
+    parser.add_argument("--update-checkpoint", action="store_true",
+                        help="load: advance the resumable upload checkpoint for --jsonl")
+    parser.add_argument("--download", metavar="DIR", help="snapshot: also save the snapshot file to DIR")
+    parser.add_argument("--location", help="restore: local snapshot file, or URL / file:// path visible to the node")
+    parser.add_argument("--checksum", default=None, help="restore: expected sha256 of the snapshot")
+    parser.add_argument("--snapshot-api-key", default=None, help="API key of the node serving the snapshot URL")
+    args = parser.parse_args()
+
+    if args.command == "build":
+        build_embedding_artifact(args.jsonl, root=args.artifact_root, model_name=args.model_name, version=args.version)
+        return
+
+    qdrant_url = os.getenv("QDRANT_URL", "https://YOUR-INSTANCE.gcp.cloud.qdrant.io")
+    api_key = os.getenv("QDRANT_API_KEY")
+    if not api_key:
+        raise RuntimeError("Set QDRANT_API_KEY in your environment or .env")
+    client = QdrantClient(url=qdrant_url, api_key=api_key)
+
+    if args.command == "load":
+        artifact = load_embedding_artifact(args.artifact_root, args.model_name, args.version)
+        bulk_load_collection(
+            client, args.collection, artifact, recreate=args.recreate,
+            checkpoint_source=args.jsonl if args.update_checkpoint else None,
+        )
+    elif args.command == "snapshot":
+        snapshot = create_collection_snapshot(client, args.collection, qdrant_url=qdrant_url)
+        if args.download and snapshot is not None:
+            download_collection_snapshot(qdrant_url, api_key, args.collection, snapshot.name, args.download)
+    else:
+        if not args.location:
+            parser.error("restore needs --location")
+        if os.path.isfile(args.location):
+            upload_collection_snapshot(qdrant_url, api_key, args.collection, args.location, checksum=args.checksum)
+        else:
+            restore_collection_snapshot(
+                client, args.collection, args.location, api_key=args.snapshot_api_key, checksum=args.checksum
+            )
+
+
+if __name__ == "__main__":
+    main()
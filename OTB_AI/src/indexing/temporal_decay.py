@@ -0,0 +1,189 @@
+"""
+Recency-aware scoring for tweet search, evaluated inside Qdrant.
+
+- Tweets are ingested with an RFC 3339 `timestamp` payload backed by a datetime index
+- `build_time_window_filter` drops tweets older than `max_age_hours` before scoring
+- `build_recency_formula` blends vector similarity with an exp/gauss decay on the
+  tweet age, so Qdrant returns points already ranked by the fresh-tweet score
+"""
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Optional, Set, Tuple
+
+from qdrant_client import models
+
+TIMESTAMP_FIELD = "timestamp"
+
+# Points ingested before timestamps existed fall back to the epoch, i.e. fully decayed.
+MISSING_TIMESTAMP_DEFAULT = "1970-01-01T00:00:00Z"
+
+DECAY_FUNCTIONS = ("exp", "gauss")
+
+# Epoch values above this are taken as milliseconds (1e11 s is the year 5138).
+EPOCH_MS_CUTOFF = 1e11
+
+
+# ------------------------------
+# Timestamp helpers
+# ------------------------------
+def to_rfc3339(dt: datetime) -> str:
+    """Format a datetime as a UTC RFC 3339 string (naive datetimes are treated as UTC)."""
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def parse_timestamp(value) -> Optional[str]:
+    """
+    Normalise a raw tweet timestamp to RFC 3339.
+    Accepts epoch seconds or milliseconds (numbers or digit strings), ISO 8601 strings
+    and Twitter's `created_at` format.
+    Returns None if the value cannot be parsed.
+    """
+    if value is None or value == "" or isinstance(value, bool):
+        return None
+    if isinstance(value, datetime):
+        return to_rfc3339(value)
+    text = str(value).strip()
+    if isinstance(value, (int, float)) or text.replace(".", "", 1).isdigit():
+        try:
+            epoch = float(text)
+            if epoch > EPOCH_MS_CUTOFF:
+                epoch /= 1000.0
+            return to_rfc3339(datetime.fromtimestamp(epoch, tz=timezone.utc))
+        except (ValueError, OverflowError, OSError):
+            return None
+    try:
+        return to_rfc3339(datetime.fromisoformat(text.replace("Z", "+00:00")))
+    except ValueError:
+        pass
+    try:
+        # Twitter API v1 style: "Wed Oct 10 20:19:24 +0000 2018"
+        return to_rfc3339(datetime.strptime(text, "%a %b %d %H:%M:%S %z %Y"))
+    except ValueError:
+        return None
+
+
+def ensure_timestamp_index(client, collection_name: str) -> None:
+    """Create the datetime payload index used by the time-window prefilter (idempotent)."""
+    try:
+        client.create_payload_index(
+            collection_name=collection_name,
+            field_name=TIMESTAMP_FIELD,
+            field_schema=models.DatetimeIndexParams(
+                type=models.DatetimeIndexType.DATETIME,
+                is_principal=True,
+            ),
+        )
+    except Exception:
+        pass
+
+
+_indexed_collections: Set[Tuple[int, str]] = set()
+_indexed_lock = threading.Lock()
+
+
+def ensure_timestamp_index_once(client, collection_name: str) -> None:
+    """
+    `ensure_timestamp_index` at most once per (client, collection) in this process.
+    Called before windowed queries so collections ingested before timestamps existed
+    get the index the filter needs; their untimestamped points are simply filtered out.
+    """
+    key = (id(client), collection_name)
+    with _indexed_lock:
+        if key in _indexed_collections:
+            return
+        ensure_timestamp_index(client, collection_name)
+        _indexed_collections.add(key)
+
+
+# ------------------------------
+# Query building blocks
+# ------------------------------
+def build_time_window_filter(max_age_hours: Optional[float], now: Optional[datetime] = None) -> Optional[models.Filter]:
+    """Return a filter keeping only tweets newer than `max_age_hours` (None = no window)."""
+    if max_age_hours is None:
+        return None
+    now = now or datetime.now(timezone.utc)
+    return models.Filter(
+        must=[
+            models.FieldCondition(
+                key=TIMESTAMP_FIELD,
+                range=models.DatetimeRange(gte=to_rfc3339(now - timedelta(hours=max_age_hours))),
+            )
+        ]
+    )
+
+
+def build_recency_formula(
+    half_life_hours: float = 24.0,
+    recency_weight: float = 0.3,
+    decay: str = "exp",
+    now: Optional[datetime] = None,
+) -> models.FormulaQuery:
+    """
+    Build the score formula:
+
+        (1 - recency_weight) * $score + recency_weight * decay(age)
+
+    where decay(age) is 1.0 for a tweet posted `now` and 0.5 once it is
+    `half_life_hours` old.
+    """
+    if half_life_hours <= 0:
+        raise ValueError("half_life_hours must be positive")
+    if not 0.0 <= recency_weight <= 1.0:
+        raise ValueError("recency_weight must be between 0 and 1")
+    if decay not in DECAY_FUNCTIONS:
+        raise ValueError(f"decay must be one of {DECAY_FUNCTIONS}")
+
+    now = now or datetime.now(timezone.utc)
+    params = models.DecayParamsExpression(
+        x=models.DatetimeKeyExpression(datetime_key=TIMESTAMP_FIELD),
+        target=models.DatetimeExpression(datetime=to_rfc3339(now)),
+        scale=half_life_hours * 3600.0,  # datetime distances are in seconds
+        midpoint=0.5,
+    )
+    if decay == "gauss":
+        decay_expr = models.GaussDecayExpression(gauss_decay=params)
+    else:
+        decay_expr = models.ExpDecayExpression(exp_decay=params)
+
+    return models.FormulaQuery(
+        formula=models.SumExpression(
+            sum=[
+                models.MultExpression(mult=[1.0 - recency_weight, "$score"]),
+                models.MultExpression(mult=[recency_weight, decay_expr]),
+            ]
+        ),
+        defaults={TIMESTAMP_FIELD: MISSING_TIMESTAMP_DEFAULT},
+    )
+
+
+def recency_query_kwargs(
+    query_vector,
+    limit: int,
+    candidate_limit: int,
+    half_life_hours: float = 24.0,
+    recency_weight: float = 0.3,
+    max_age_hours: Optional[float] = None,
+    decay: str = "exp",
+) -> dict:
+    """
+    Keyword arguments for `client.query_points` that run a vector prefetch restricted
+    to the time window and rescore the candidates with the recency formula server-side.
+    """
+    now = datetime.now(timezone.utc)
+    return {
+        "prefetch": models.Prefetch(
+            query=query_vector,
+            filter=build_time_window_filter(max_age_hours, now=now),
+            limit=candidate_limit,
+        ),
+        "query": build_recency_formula(
+            half_life_hours=half_life_hours,
+            recency_weight=recency_weight,
+            decay=decay,
+            now=now,
+        ),
+        "limit": limit,
+    }
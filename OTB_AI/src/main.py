@@ -1,11 +1,13 @@
 import os
 import json
+import asyncio
 import numpy as np
 from dotenv import load_dotenv
 from mistralai import Mistral
 from qdrant_client import QdrantClient
-from fastembed import TextEmbedding
 from src.embeddings.text_embeddings import hybrid_search
+from src.embeddings.embedding_batcher import QUERY_EMBED_TIMEOUT_S, get_query_embedder
+from src.utils.hedging import HedgedRequester, HedgedRequestError, Provider
 from langchain.chat_models import init_chat_model
 # ------------------------------
 # 1️⃣ Load API key and initialize Mistral
@@ -16,6 +18,16 @@ client_llm = Mistral(api_key=api_key)
 
 openai_model = init_chat_model("gpt-4o-mini", model_provider="openai")
 
+# Hedging: gpt-4o-mini is fired if Mistral has not answered within its recent p95 latency (env-tunable)
+llm_hedger = HedgedRequester(
+    hedge_percentile=float(os.getenv("LLM_HEDGE_PERCENTILE", "0.95")),
+    initial_deadline_s=float(os.getenv("LLM_HEDGE_INITIAL_DEADLINE_S", "5.0")),
+    min_deadline_s=float(os.getenv("LLM_HEDGE_MIN_DEADLINE_S", "0.5")),
+    max_deadline_s=float(os.getenv("LLM_HEDGE_MAX_DEADLINE_S", "20.0")),
+    failure_threshold=int(os.getenv("LLM_BREAKER_FAILURES", "3")),
+    reset_timeout_s=float(os.getenv("LLM_BREAKER_RESET_S", "30.0")),
+)
+
 QDRANT_URL = os.getenv("QDRANT_URL")
 API_KEY = os.getenv("QDRANT_API_KEY")
 if not API_KEY:
@@ -31,8 +43,7 @@ qdrant_client = QdrantClient(url=QDRANT_URL, api_key=API_KEY)
 # ------------------------------
 def get_text_embedding(text: str) -> np.ndarray:
     """Return embedding vector for a single text."""
-    embedding_model = TextEmbedding(model_name="BAAI/bge-small-en-v1.5")
-    return np.array(list(embedding_model.embed([text]))[0])
+    return get_query_embedder("BAAI/bge-small-en-v1.5").embed(text, timeout=QUERY_EMBED_TIMEOUT_S)
 
 
 # ------------------------------
@@ -76,28 +87,41 @@ Tweets context:
 
 
 # ------------------------------
-# 7️⃣ Run Mistral LLM
+# 7️⃣ Run Mistral LLM (hedged with OpenAI)
 # ------------------------------
-def get_llm_response(prompt_text: str, context_text: str, model="mistral-large-latest") -> dict:
-    try:
-        messages = [{"role": "user", "content": prompt_text}]
-        chat_response = client_llm.chat.complete(model=model, messages=messages)
-        response_text = chat_response.choices[0].message.content.strip()
-    except Exception as e:
-        # 🔹 Fallback to OpenAI via LangChain
-        response_text = openai_model.invoke(prompt_text).content.strip()
-
+def parse_llm_json(response_text: str) -> dict:
+    """Parse a model reply as JSON; raises json.JSONDecodeError (with `.doc`) if invalid."""
+    response_text = response_text.strip()
     # 🔥 Clean up if response is wrapped in ```json ... ```
     if response_text.startswith("```"):
         response_text = response_text.strip("`")  # remove backticks
         if response_text.lower().startswith("json"):
             response_text = response_text[4:]  # drop 'json' prefix
         response_text = response_text.strip()
+    return json.loads(response_text)
+
+
+async def get_llm_response(prompt_text: str, context_text: str, model="mistral-large-latest") -> dict:
+    async def call_mistral(prompt: str) -> str:
+        messages = [{"role": "user", "content": prompt}]
+        chat_response = await client_llm.chat.complete_async(model=model, messages=messages)
+        return chat_response.choices[0].message.content
+
+    async def call_openai(prompt: str) -> str:
+        return (await openai_model.ainvoke(prompt)).content
 
+    providers = [
+        Provider(name=f"mistral/{model}", call=call_mistral),
+        Provider(name="openai/gpt-4o-mini", call=call_openai),
+    ]
     try:
-        parsed_output = json.loads(response_text)
-    except json.JSONDecodeError:
-        parsed_output = {"description": response_text, "emoji_text": ""}
+        parsed_output = await llm_hedger.complete(providers, prompt_text, parse=parse_llm_json)
+    except HedgedRequestError as e:
+        # no valid JSON from anyone: keep the first plain-text answer, as before
+        for err in e.errors.values():
+            if isinstance(err, json.JSONDecodeError):
+                return {"description": err.doc, "emoji_text": ""}
+        raise
 
     # ✅ Attach context text
     return parsed_output
@@ -122,6 +146,6 @@ if __name__ == "__main__":
 
     context_text = prepare_context_text(results)  # ✅ convert results to text
     prompt = build_prompt(context_text)
-    result = run_mistral_json(prompt, context_text)
+    result = asyncio.run(get_llm_response(prompt, context_text))
 
     print(result)
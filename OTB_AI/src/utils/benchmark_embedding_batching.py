@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Load benchmark: per-request query embedding vs. micro-batched embedding.
+
+Simulates `--concurrency` clients, each embedding `--requests` single topics back to back
+against the real fastembed ONNX model, and reports throughput plus p50/p95/p99 latency
+for both modes.
+
+    python -m src.utils.benchmark_embedding_batching --concurrency 32 --requests 50 --window-ms 1 3 10
+
+Each `--window-ms` value gets its own micro-batched row, so one run shows which
+EMBED_BATCH_WINDOW_MS / EMBED_MAX_BATCH_SIZE to deploy with.
+
+Results: none recorded yet. The batcher defaults (3 ms window, batch of 32) are
+provisional until this has been run against BAAI/bge-small-en-v1.5 on the serving
+hardware; paste the table here with the CPU model and fastembed version when it has.
+"""
+import argparse
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List
+
+import numpy as np
+from fastembed import TextEmbedding
+
+from src.embeddings.embedding_batcher import DEFAULT_MODEL_NAME, EmbeddingBatcher
+
+TOPICS = [
+    "coffee", "subway delays", "pizza", "rain again", "knicks game", "concert tonight",
+    "traffic", "brunch spots", "marathon", "snow day", "rooftop bars", "farmers market",
+]
+
+
+def run_load(embed_one: Callable[[str], np.ndarray], concurrency: int, requests: int) -> dict:
+    latencies: List[float] = []
+    lock = threading.Lock()
+
+    def client(seed: int):
+        rng = random.Random(seed)
+        local = []
+        for _ in range(requests):
+            start = time.perf_counter()
+            embed_one(rng.choice(TOPICS))
+            local.append(time.perf_counter() - start)
+        with lock:
+            latencies.extend(local)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(client, range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    lat_ms = np.array(latencies) * 1000.0
+    return {
+        "throughput_rps": len(latencies) / elapsed,
+        "p50_ms": float(np.percentile(lat_ms, 50)),
+        "p95_ms": float(np.percentile(lat_ms, 95)),
+        "p99_ms": float(np.percentile(lat_ms, 99)),
+    }
+
+
+def print_row(label: str, stats: dict) -> None:
+    print(f"{label:<14} {stats['throughput_rps']:>10.1f} {stats['p50_ms']:>9.2f} {stats['p95_ms']:>9.2f} {stats['p99_ms']:>9.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--requests", type=int, default=50, help="requests per client")
+    parser.add_argument("--max-batch-size", type=int, default=32)
+    parser.add_argument("--window-ms", type=float, nargs="+", default=[3.0], help="one micro-batched run per value")
+    parser.add_argument("--model-name", default=DEFAULT_MODEL_NAME)
+    args = parser.parse_args()
+
+    model = TextEmbedding(model_name=args.model_name)
+    list(model.embed(["warmup"]))
+
+    print(f"model={args.model_name} concurrency={args.concurrency} requests/client={args.requests} "
+          f"max_batch={args.max_batch_size}")
+    print(f"{'mode':<14} {'req/s':>10} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+
+    per_request = run_load(lambda text: np.asarray(list(model.embed([text]))[0]), args.concurrency, args.requests)
+    print_row("per-request", per_request)
+
+    for window_ms in args.window_ms:
+        batcher = EmbeddingBatcher(model, max_batch_size=args.max_batch_size, max_wait_ms=window_ms)
+        try:
+            batched = run_load(batcher.embed, args.concurrency, args.requests)
+        finally:
+            batcher.close()
+        print_row(f"batched {window_ms:g}ms", batched)
+
+
+if __name__ == "__main__":
+    main()
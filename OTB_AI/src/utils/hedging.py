@@ -0,0 +1,245 @@
+"""
+Hedged requests across LLM providers.
+
+- The first available provider is called immediately
+- If it has not returned a valid answer by its adaptive deadline (a percentile of its
+  recent latencies), the next provider is fired in parallel and the first valid answer wins
+- A provider that fails outright (error / unparseable output) hands over at once
+- Per-provider circuit breakers route around providers that keep failing
+
+Providers are coroutines raced as asyncio tasks on the caller's event loop, so there is
+no worker pool to queue behind, deadlines count from when the call actually starts, and
+the losing call is cancelled.
+"""
+import asyncio
+import math
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Sequence
+
+
+# ------------------------------
+# Per-provider latency histogram
+# ------------------------------
+class LatencyHistogram:
+    """Rolling window of call latencies (seconds)."""
+
+    def __init__(self, window: int = 200):
+        self._samples: Deque[float] = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, latency_s: float) -> None:
+        with self._lock:
+            self._samples.append(latency_s)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._samples)
+
+    def percentile(self, q: float) -> Optional[float]:
+        """Nearest-rank percentile, q in [0, 1]. None if no samples yet."""
+        with self._lock:
+            samples = sorted(self._samples)
+        if not samples:
+            return None
+        rank = max(1, math.ceil(q * len(samples)))
+        return samples[min(rank, len(samples)) - 1]
+
+
+# ------------------------------
+# Circuit breaker
+# ------------------------------
+class CircuitBreaker:
+    """
+    closed -> open after `failure_threshold` consecutive failures.
+    open -> half-open after `reset_timeout_s`; a single probe call then decides whether
+    to close or re-open, and other callers are turned away while it is in flight.
+    """
+
+    def __init__(self, failure_threshold: int = 3, reset_timeout_s: float = 30.0, clock: Callable[[], float] = time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout_s = reset_timeout_s
+        self._clock = clock
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._state()
+
+    def _state(self) -> str:
+        if self._opened_at is None:
+            return "closed"
+        if self._clock() - self._opened_at >= self.reset_timeout_s:
+            return "half_open"
+        return "open"
+
+    def allow(self) -> bool:
+        """Whether a call may go to this provider now; in half-open, claims the single probe."""
+        with self._lock:
+            state = self._state()
+            if state == "closed":
+                return True
+            if state == "half_open" and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+            return False
+
+    def release(self) -> None:
+        """Give back an unfinished probe (e.g. the call was cancelled) without an outcome."""
+        with self._lock:
+            self._probe_in_flight = False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._probe_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            self._probe_in_flight = False
+            if self._opened_at is not None or self._failures >= self.failure_threshold:
+                self._opened_at = self._clock()
+
+
+# ------------------------------
+# Hedged requester
+# ------------------------------
+@dataclass
+class Provider:
+    """A named backend: `await call(prompt)` returns the raw completion text."""
+    name: str
+    call: Callable[[str], Awaitable[str]]
+
+
+class CircuitOpenError(RuntimeError):
+    """The provider was skipped because its circuit breaker is open."""
+
+
+class HedgedRequestError(RuntimeError):
+    """Raised when every provider failed; `errors` maps provider name -> exception."""
+
+    def __init__(self, errors: Dict[str, BaseException]):
+        self.errors = errors
+        detail = ", ".join(f"{name}: {err!r}" for name, err in errors.items()) or "no providers"
+        super().__init__(f"All LLM providers failed ({detail})")
+
+
+class HedgedRequester:
+    """
+    Race providers in priority order with latency-based hedging.
+
+    hedge_percentile: latency percentile of a provider that sets its hedge deadline
+    initial_deadline_s: deadline used until `min_samples` latencies are recorded
+    min_deadline_s / max_deadline_s: clamp for the adaptive deadline
+    """
+
+    def __init__(
+        self,
+        hedge_percentile: float = 0.95,
+        initial_deadline_s: float = 5.0,
+        min_deadline_s: float = 0.5,
+        max_deadline_s: float = 20.0,
+        min_samples: int = 20,
+        histogram_window: int = 200,
+        failure_threshold: int = 3,
+        reset_timeout_s: float = 30.0,
+    ):
+        self.hedge_percentile = hedge_percentile
+        self.initial_deadline_s = initial_deadline_s
+        self.min_deadline_s = min_deadline_s
+        self.max_deadline_s = max_deadline_s
+        self.min_samples = min_samples
+        self.histogram_window = histogram_window
+        self.failure_threshold = failure_threshold
+        self.reset_timeout_s = reset_timeout_s
+        self.histograms: Dict[str, LatencyHistogram] = {}
+        self.breakers: Dict[str, CircuitBreaker] = {}
+        self._lock = threading.Lock()
+
+    def _stats(self, name: str):
+        with self._lock:
+            if name not in self.histograms:
+                self.histograms[name] = LatencyHistogram(self.histogram_window)
+                self.breakers[name] = CircuitBreaker(self.failure_threshold, self.reset_timeout_s)
+            return self.histograms[name], self.breakers[name]
+
+    def deadline_for(self, name: str) -> float:
+        """Seconds to wait on `name` before firing the next provider."""
+        hist, _ = self._stats(name)
+        if len(hist) < self.min_samples:
+            return self.initial_deadline_s
+        p = hist.percentile(self.hedge_percentile)
+        return min(self.max_deadline_s, max(self.min_deadline_s, p))
+
+    async def _run(self, provider: Provider, prompt: str, parse: Callable[[str], Any]) -> Any:
+        hist, breaker = self._stats(provider.name)
+        start = time.perf_counter()
+        try:
+            value = parse(await provider.call(prompt))
+        except asyncio.CancelledError:
+            # lost the race after outrunning its own deadline: the true latency is at least
+            # this long, so keep it rather than letting the histogram see only the winners
+            elapsed = time.perf_counter() - start
+            if elapsed >= self.deadline_for(provider.name):
+                hist.record(elapsed)
+            raise
+        except Exception:
+            breaker.record_failure()
+            raise
+        hist.record(time.perf_counter() - start)
+        breaker.record_success()
+        return value
+
+    async def complete(self, providers: Sequence[Provider], prompt: str, parse: Callable[[str], Any] = lambda text: text) -> Any:
+        """
+        Return `parse(text)` from the first provider to answer validly.
+        `parse` should raise on invalid output; that counts as a provider failure.
+        """
+        queue: List[Provider] = list(providers)
+        pending: Dict[asyncio.Task, str] = {}
+        errors: Dict[str, BaseException] = {}
+
+        def launch() -> Optional[float]:
+            """Start the next provider whose breaker allows it; return its hedge deadline."""
+            while queue:
+                provider = queue.pop(0)
+                breaker = self._stats(provider.name)[1]
+                if not breaker.allow():
+                    errors[provider.name] = CircuitOpenError(f"circuit open for {provider.name}")
+                    continue
+                task = asyncio.create_task(self._run(provider, prompt, parse))
+                # a cancelled call has no outcome: hand back a half-open probe it may hold
+                task.add_done_callback(lambda t, b=breaker: b.release() if t.cancelled() else None)
+                pending[task] = provider.name
+                return self.deadline_for(provider.name) if queue else None
+            return None
+
+        timeout = launch()
+        try:
+            while pending:
+                done, _ = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    # deadline passed without an answer -> hedge with the next provider
+                    timeout = launch()
+                    continue
+                for task in done:
+                    name = pending.pop(task)
+                    try:
+                        return task.result()
+                    except Exception as e:
+                        errors[name] = e
+                if queue:
+                    # a provider failed outright -> don't wait for a deadline
+                    timeout = launch()
+        finally:
+            for loser in pending:
+                loser.cancel()
+        raise HedgedRequestError(errors)
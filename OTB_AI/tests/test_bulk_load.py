@@ -0,0 +1,186 @@
+import json
+
+import numpy as np
+import pytest
+from qdrant_client import QdrantClient, models
+
+from src.embeddings.embedding_artifacts import (
+    build_embedding_artifact,
+    latest_version,
+    load_embedding_artifact,
+)
+from src.embeddings.text_embeddings import read_checkpoint, write_checkpoint
+from src.indexing.bulk_load import bulk_load_collection
+
+MODEL = "test/stub-model"
+
+
+class StubModel:
+    """Deterministic 4-d embeddings; counts embed calls."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def embed(self, texts):
+        self.calls += 1
+        return [np.array([len(t), t.count("a"), 1.0, 0.5], dtype=np.float32) for t in texts]
+
+
+@pytest.fixture
+def dataset(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)  # checkpoint file is written to the cwd
+    rows = [
+        {"text": "bagels and coffee", "coordinates": ["-73.9", "40.7"]},
+        "not json",
+        {"text": "", "coordinates": ["-73.9", "40.7"]},
+        {"text": "late night pizza", "coordinates": ["-75.1", "40.0"], "created_at": "2025-01-02T12:00:00Z"},
+        {"text": "snow again", "coordinates": ["-79.7", "43.2"]},
+    ]
+    path = tmp_path / "tweets.jsonl"
+    path.write_text("\n".join(r if isinstance(r, str) else json.dumps(r) for r in rows) + "\n")
+    return str(path)
+
+
+def test_build_and_load_artifact(dataset, tmp_path):
+    model = StubModel()
+    root = str(tmp_path / "artifacts")
+    built = build_embedding_artifact(dataset, root=root, model_name=MODEL, version="v1", chunk_size=2, embedding_model=model)
+
+    assert latest_version(root, MODEL) == "v1"
+    artifact = load_embedding_artifact(root, MODEL)
+    assert len(artifact) == len(built) == 3
+    assert artifact.vectors.dtype == np.float32
+    assert isinstance(artifact.vectors, np.memmap)
+    assert artifact.vectors.shape == (3, 4)
+    assert list(artifact.ids()) == [1, 4, 5]  # ids are JSONL line numbers, as in the resumable upload
+    payloads = list(artifact.payloads())
+    assert payloads[1]["document"] == "late night pizza"
+    assert payloads[1]["timestamp"] == "2025-01-02T12:00:00Z"
+    np.testing.assert_array_equal(artifact.vectors[1], [16, 2, 1.0, 0.5])
+
+    with pytest.raises(FileExistsError):
+        build_embedding_artifact(dataset, root=root, model_name=MODEL, version="v1", embedding_model=model)
+    with pytest.raises(FileNotFoundError):
+        load_embedding_artifact(root, "other/model")
+
+
+def test_bulk_load_collection_from_artifact(dataset, tmp_path):
+    root = str(tmp_path / "artifacts")
+    artifact = build_embedding_artifact(dataset, root=root, model_name=MODEL, version="v1", embedding_model=StubModel())
+    client = QdrantClient(":memory:")
+
+    bulk_load_collection(client, "tweets", artifact, batch_size=2)
+
+    assert client.count("tweets").count == 3
+    points = client.retrieve("tweets", ids=[4], with_vectors=True)
+    assert points[0].payload["document"] == "late night pizza"
+    assert read_checkpoint("tweets") == 0  # checkpoint is opt-in
+
+    bulk_load_collection(client, "tweets", artifact, recreate=True)
+    assert client.count("tweets").count == 3
+
+
+class ThresholdTrackingClient:
+    """Local client proxy that keeps the indexing_threshold local mode ignores."""
+
+    def __init__(self, indexing_threshold):
+        self._client = QdrantClient(":memory:")
+        self.indexing_threshold = indexing_threshold
+        self.thresholds_set = []
+
+    def __getattr__(self, name):
+        return getattr(self._client, name)
+
+    def get_collection(self, collection_name):
+        info = self._client.get_collection(collection_name)
+        info.config.optimizer_config.indexing_threshold = self.indexing_threshold
+        return info
+
+    def update_collection(self, collection_name, optimizers_config=None, **kwargs):
+        self.indexing_threshold = optimizers_config.indexing_threshold
+        self.thresholds_set.append(self.indexing_threshold)
+        return True
+
+
+def test_bulk_load_restores_previous_indexing_threshold(dataset, tmp_path):
+    artifact = build_embedding_artifact(dataset, root=str(tmp_path / "a"), model_name=MODEL, version="v1", embedding_model=StubModel())
+    client = ThresholdTrackingClient(indexing_threshold=5000)
+    client.create_collection("tweets", vectors_config=models.VectorParams(size=4, distance=models.Distance.COSINE))
+
+    bulk_load_collection(client, "tweets", artifact)
+
+    assert client.thresholds_set == [0, 5000]
+    assert client.count("tweets").count == 3
+
+
+def test_bulk_load_rejects_mismatched_collection(dataset, tmp_path):
+    artifact = build_embedding_artifact(dataset, root=str(tmp_path / "a"), model_name=MODEL, version="v1", embedding_model=StubModel())
+    client = QdrantClient(":memory:")
+    client.create_collection("tweets", vectors_config=models.VectorParams(size=8, distance=models.Distance.COSINE))
+
+    with pytest.raises(ValueError, match="size=4"):
+        bulk_load_collection(client, "tweets", artifact)
+    assert client.count("tweets").count == 0
+
+    bulk_load_collection(client, "tweets", artifact, recreate=True)
+    assert client.count("tweets").count == 3
+
+
+def test_bulk_load_checkpoint_only_for_matching_source(dataset, tmp_path):
+    artifact = build_embedding_artifact(dataset, root=str(tmp_path / "a"), model_name=MODEL, version="v1", embedding_model=StubModel())
+    client = QdrantClient(":memory:")
+
+    bulk_load_collection(client, "tweets", artifact, checkpoint_source="other.jsonl")
+    assert read_checkpoint("tweets") == 0
+
+    bulk_load_collection(client, "tweets", artifact, checkpoint_source="tweets.jsonl")  # relative to cwd
+    assert read_checkpoint("tweets") == 5
+
+    write_checkpoint("tweets", 40)  # incremental uploads got further than the artifact
+    bulk_load_collection(client, "tweets", artifact, checkpoint_source=dataset)
+    assert read_checkpoint("tweets") == 40
+
+
+class FailingClient(ThresholdTrackingClient):
+    def __init__(self, fail_upload, fail_restore):
+        super().__init__(indexing_threshold=5000)
+        self.fail_upload = fail_upload
+        self.fail_restore = fail_restore
+
+    def upload_collection(self, *args, **kwargs):
+        if self.fail_upload:
+            raise ConnectionError("upload dropped")
+        return self._client.upload_collection(*args, **kwargs)
+
+    def update_collection(self, collection_name, optimizers_config=None, **kwargs):
+        if self.fail_restore and optimizers_config.indexing_threshold != 0:
+            raise TimeoutError("restore timed out")
+        return super().update_collection(collection_name, optimizers_config=optimizers_config, **kwargs)
+
+
+@pytest.mark.parametrize(
+    "fail_upload, fail_restore, expected",
+    [(True, False, ConnectionError), (True, True, ConnectionError), (False, True, TimeoutError)],
+)
+def test_bulk_load_restore_failure_does_not_mask_upload_error(dataset, tmp_path, fail_upload, fail_restore, expected):
+    artifact = build_embedding_artifact(dataset, root=str(tmp_path / "a"), model_name=MODEL, version="v1", embedding_model=StubModel())
+    client = FailingClient(fail_upload, fail_restore)
+    client.create_collection("tweets", vectors_config=models.VectorParams(size=4, distance=models.Distance.COSINE))
+
+    with pytest.raises(expected):
+        bulk_load_collection(client, "tweets", artifact, checkpoint_source=dataset)
+    assert client.thresholds_set == ([0] if fail_restore else [0, 5000])
+    assert read_checkpoint("tweets") == 0
+
+
+def test_latest_version_uses_build_time_not_name(dataset, tmp_path):
+    root = str(tmp_path / "a")
+    for version, created_at in [("v10", "2025-01-01T00:00:00Z"), ("v9", "2025-02-01T00:00:00Z")]:
+        build_embedding_artifact(dataset, root=root, model_name=MODEL, version=version, embedding_model=StubModel())
+        manifest_path = tmp_path / "a" / "test__stub-model" / version / "manifest.json"
+        manifest = json.loads(manifest_path.read_text())
+        manifest["created_at"] = created_at
+        manifest_path.write_text(json.dumps(manifest))
+
+    assert latest_version(root, MODEL) == "v9"
+    assert load_embedding_artifact(root, MODEL).manifest["version"] == "v9"
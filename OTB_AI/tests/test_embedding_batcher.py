@@ -0,0 +1,135 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+from src.embeddings.embedding_batcher import EmbeddingBatcher
+
+
+class RecordingModel:
+    """Stub model: vector = [len(text)], records batch sizes."""
+
+    def __init__(self, fail=False):
+        self.batches = []
+        self.fail = fail
+        self._lock = threading.Lock()
+
+    def embed(self, texts):
+        with self._lock:
+            self.batches.append(list(texts))
+        if self.fail:
+            raise RuntimeError("model down")
+        return [np.array([float(len(t))]) for t in texts]
+
+
+def test_single_request_gets_its_vector():
+    batcher = EmbeddingBatcher(RecordingModel(), max_wait_ms=1)
+    try:
+        assert batcher.embed("abc").tolist() == [3.0]
+    finally:
+        batcher.close()
+
+
+def test_concurrent_requests_are_coalesced():
+    model = RecordingModel()
+    batcher = EmbeddingBatcher(model, max_batch_size=64, max_wait_ms=50)
+    texts = ["x" * i for i in range(1, 21)]
+    try:
+        with ThreadPoolExecutor(max_workers=len(texts)) as pool:
+            vectors = list(pool.map(batcher.embed, texts))
+    finally:
+        batcher.close()
+    assert [v.tolist() for v in vectors] == [[float(len(t))] for t in texts]
+    assert len(model.batches) < len(texts)
+    assert sorted(t for batch in model.batches for t in batch) == sorted(texts)
+
+
+def test_batch_size_is_capped():
+    model = RecordingModel()
+    batcher = EmbeddingBatcher(model, max_batch_size=4, max_wait_ms=50)
+    try:
+        futures = [batcher.submit(str(i)) for i in range(10)]
+        [f.result(timeout=2) for f in futures]
+    finally:
+        batcher.close()
+    assert max(len(b) for b in model.batches) <= 4
+
+
+def test_window_bounds_wait_for_lone_request():
+    batcher = EmbeddingBatcher(RecordingModel(), max_batch_size=64, max_wait_ms=5)
+    try:
+        start = time.perf_counter()
+        batcher.embed("solo")
+        assert time.perf_counter() - start < 0.5
+    finally:
+        batcher.close()
+
+
+def test_model_errors_propagate_to_every_caller():
+    batcher = EmbeddingBatcher(RecordingModel(fail=True), max_wait_ms=20)
+    try:
+        futures = [batcher.submit("a"), batcher.submit("b")]
+        for fut in futures:
+            with pytest.raises(RuntimeError, match="model down"):
+                fut.result(timeout=2)
+    finally:
+        batcher.close()
+
+
+def test_cancelled_request_does_not_kill_worker():
+    model = RecordingModel()
+    batcher = EmbeddingBatcher(model, max_wait_ms=50)
+    try:
+        cancelled = batcher.submit("gone")
+        assert cancelled.cancel()
+        assert batcher.embed("kept", timeout=2).tolist() == [4.0]
+        assert batcher.embed("again", timeout=2).tolist() == [5.0]
+    finally:
+        batcher.close()
+    assert all("gone" not in batch for batch in model.batches)
+
+
+def test_worker_survives_unexpected_errors():
+    batcher = EmbeddingBatcher(RecordingModel(), max_wait_ms=1)
+    run_batch = batcher._run_batch
+    calls = []
+
+    def flaky(batch):
+        calls.append(batch)
+        if len(calls) == 1:
+            raise TypeError("unexpected")
+        run_batch(batch)
+
+    batcher._run_batch = flaky
+    try:
+        with pytest.raises(TypeError):
+            batcher.embed("first", timeout=2)
+        assert batcher.embed("second", timeout=2).tolist() == [6.0]
+    finally:
+        batcher.close()
+
+
+def test_embed_timeout_cancels_request():
+    class SlowModel(RecordingModel):
+        def embed(self, texts):
+            time.sleep(0.2)
+            return super().embed(texts)
+
+    batcher = EmbeddingBatcher(SlowModel(), max_wait_ms=1)
+    try:
+        batcher.submit("busy")  # occupies the worker
+        time.sleep(0.02)
+        with pytest.raises(TimeoutError):
+            batcher.embed("late", timeout=0.05)
+        assert batcher.embed("next", timeout=2).tolist() == [4.0]
+    finally:
+        batcher.close()
+
+
+def test_closed_batcher_rejects_new_texts():
+    batcher = EmbeddingBatcher(RecordingModel())
+    batcher.close()
+    with pytest.raises(RuntimeError):
+        batcher.submit("late")
@@ -0,0 +1,193 @@
+import asyncio
+import json
+import time
+
+import pytest
+
+from src.utils.hedging import (
+    CircuitBreaker,
+    CircuitOpenError,
+    HedgedRequester,
+    HedgedRequestError,
+    LatencyHistogram,
+    Provider,
+)
+
+
+class StubProvider:
+    """Async provider stub with injected latency; records calls and cancellations."""
+
+    def __init__(self, name, latency_s=0.0, reply='{"description": "ok"}', error=None):
+        self.name = name
+        self.latency_s = latency_s
+        self.reply = reply
+        self.error = error
+        self.calls = 0
+        self.cancelled = 0
+
+    async def __call__(self, prompt):
+        self.calls += 1
+        try:
+            await asyncio.sleep(self.latency_s)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        if self.error is not None:
+            raise self.error
+        return self.reply
+
+    def provider(self):
+        return Provider(name=self.name, call=self)
+
+
+def make_requester(**kwargs):
+    kwargs.setdefault("initial_deadline_s", 0.05)
+    kwargs.setdefault("min_deadline_s", 0.01)
+    return HedgedRequester(**kwargs)
+
+
+def complete(requester, *stubs):
+    return asyncio.run(requester.complete([s.provider() for s in stubs], "p", parse=json.loads))
+
+
+def test_fast_primary_wins_without_hedging():
+    primary = StubProvider("primary", reply='{"who": "primary"}')
+    secondary = StubProvider("secondary", reply='{"who": "secondary"}')
+    assert complete(make_requester(), primary, secondary) == {"who": "primary"}
+    assert secondary.calls == 0
+
+
+def test_slow_primary_is_hedged_and_cancelled():
+    primary = StubProvider("primary", latency_s=0.5, reply='{"who": "primary"}')
+    secondary = StubProvider("secondary", reply='{"who": "secondary"}')
+
+    async def run():
+        out = await make_requester().complete([primary.provider(), secondary.provider()], "p", parse=json.loads)
+        await asyncio.sleep(0)  # let the cancellation reach the loser
+        return out
+
+    start = time.perf_counter()
+    assert asyncio.run(run()) == {"who": "secondary"}
+    assert time.perf_counter() - start < 0.3  # answered around the 50 ms deadline, not 500 ms
+    assert primary.cancelled == 1
+
+
+def test_failed_primary_hands_over_before_deadline():
+    primary = StubProvider("primary", error=RuntimeError("boom"))
+    secondary = StubProvider("secondary", reply='{"who": "secondary"}')
+    start = time.perf_counter()
+    assert complete(make_requester(initial_deadline_s=5.0), primary, secondary) == {"who": "secondary"}
+    assert time.perf_counter() - start < 1.0
+
+
+def test_invalid_json_counts_as_failure():
+    primary = StubProvider("primary", reply="not json")
+    secondary = StubProvider("secondary", latency_s=0.02, reply='{"who": "secondary"}')
+    assert complete(make_requester(), primary, secondary) == {"who": "secondary"}
+
+
+def test_all_providers_failing_raises_with_errors():
+    primary = StubProvider("primary", reply="not json")
+    secondary = StubProvider("secondary", error=RuntimeError("down"))
+    with pytest.raises(HedgedRequestError) as exc_info:
+        complete(make_requester(), primary, secondary)
+    errors = exc_info.value.errors
+    assert isinstance(errors["primary"], json.JSONDecodeError)
+    assert errors["primary"].doc == "not json"
+    assert isinstance(errors["secondary"], RuntimeError)
+
+
+def test_concurrent_requests_do_not_queue():
+    requester = make_requester(initial_deadline_s=5.0)
+    primary = StubProvider("primary", latency_s=0.3, reply='{"who": "primary"}')
+    secondary = StubProvider("secondary", reply='{"who": "secondary"}')
+    providers = [primary.provider(), secondary.provider()]
+
+    async def run():
+        return await asyncio.gather(*(requester.complete(providers, "p", parse=json.loads) for _ in range(40)))
+
+    start = time.perf_counter()
+    results = asyncio.run(run())
+    assert time.perf_counter() - start < 0.6
+    assert results == [{"who": "primary"}] * 40
+    assert secondary.calls == 0
+
+
+def test_circuit_breaker_routes_around_failing_provider():
+    primary = StubProvider("primary", error=RuntimeError("boom"))
+    secondary = StubProvider("secondary", reply='{"who": "secondary"}')
+    requester = make_requester(failure_threshold=2, reset_timeout_s=60)
+    for _ in range(4):
+        assert complete(requester, primary, secondary) == {"who": "secondary"}
+    assert primary.calls == 2
+    assert requester.breakers["primary"].state == "open"
+
+
+def test_open_breakers_everywhere_raise_without_calling():
+    primary = StubProvider("primary", error=RuntimeError("boom"))
+    requester = make_requester(failure_threshold=1, reset_timeout_s=60)
+    with pytest.raises(HedgedRequestError):
+        complete(requester, primary)
+    with pytest.raises(HedgedRequestError) as exc_info:
+        complete(requester, primary)
+    assert isinstance(exc_info.value.errors["primary"], CircuitOpenError)
+    assert primary.calls == 1
+
+
+def test_deadline_adapts_to_latency_percentile():
+    requester = make_requester(hedge_percentile=0.9, min_samples=10, max_deadline_s=1.0)
+    assert requester.deadline_for("primary") == 0.05
+    hist = requester.histograms["primary"]
+    for ms in range(1, 11):
+        hist.record(ms / 100)
+    assert requester.deadline_for("primary") == pytest.approx(0.09)
+    for _ in range(5):
+        hist.record(5.0)
+    assert requester.deadline_for("primary") == 1.0  # clamped to max_deadline_s
+
+
+def test_latency_histogram_percentile():
+    hist = LatencyHistogram(window=3)
+    assert hist.percentile(0.5) is None
+    for v in (1.0, 2.0, 3.0, 4.0):
+        hist.record(v)
+    assert len(hist) == 3
+    assert hist.percentile(0.5) == 3.0
+    assert hist.percentile(1.0) == 4.0
+
+
+def test_circuit_breaker_half_open_allows_single_probe():
+    now = [0.0]
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout_s=10, clock=lambda: now[0])
+    breaker.record_failure()
+    assert breaker.state == "open" and not breaker.allow()
+    now[0] = 10.0
+    assert breaker.state == "half_open"
+    assert breaker.allow()
+    assert not breaker.allow()  # probe already in flight
+    breaker.record_failure()
+    assert breaker.state == "open"
+    now[0] = 20.0
+    assert breaker.allow()
+    breaker.release()  # cancelled probe: no outcome, next caller may probe
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == "closed"
+    assert breaker.allow() and breaker.allow()
+
+
+def test_cancelled_probe_is_released():
+    requester = make_requester(failure_threshold=1, reset_timeout_s=0.0)
+    primary = StubProvider("primary", latency_s=0.5, reply='{"who": "primary"}')
+    secondary = StubProvider("secondary", reply='{"who": "secondary"}')
+    breaker = requester._stats("primary")[1]
+    breaker.record_failure()  # half-open immediately (reset_timeout_s=0)
+
+    async def run():
+        out = await requester.complete([primary.provider(), secondary.provider()], "p", parse=json.loads)
+        await asyncio.sleep(0.01)
+        return out
+
+    assert asyncio.run(run()) == {"who": "secondary"}
+    assert primary.cancelled == 1
+    assert breaker.allow()
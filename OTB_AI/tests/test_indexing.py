@@ -0,0 +1,155 @@
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+import pytest
+from qdrant_client import QdrantClient, models
+
+from src.embeddings import text_embeddings
+from src.indexing.temporal_decay import (
+    MISSING_TIMESTAMP_DEFAULT,
+    TIMESTAMP_FIELD,
+    build_recency_formula,
+    build_time_window_filter,
+    parse_timestamp,
+    recency_query_kwargs,
+    to_rfc3339,
+)
+
+NOW = datetime(2025, 1, 2, 12, 0, 0, tzinfo=timezone.utc)
+
+
+def test_parse_timestamp_formats():
+    assert parse_timestamp("2025-01-02T12:00:00+00:00") == "2025-01-02T12:00:00Z"
+    assert parse_timestamp("Thu Jan 02 12:00:00 +0000 2025") == "2025-01-02T12:00:00Z"
+    assert parse_timestamp(NOW.timestamp()) == "2025-01-02T12:00:00Z"
+    assert parse_timestamp("1735819200") == "2025-01-02T12:00:00Z"
+    assert parse_timestamp(1735819200000) == "2025-01-02T12:00:00Z"
+    assert parse_timestamp("1735819200000") == "2025-01-02T12:00:00Z"
+    assert parse_timestamp(1e300) is None
+    assert parse_timestamp(float("nan")) is None
+    assert parse_timestamp("not a date") is None
+    assert parse_timestamp(None) is None
+
+
+def test_time_window_filter():
+    assert build_time_window_filter(None) is None
+    flt = build_time_window_filter(24, now=NOW)
+    cond = flt.must[0]
+    assert cond.key == TIMESTAMP_FIELD
+    assert cond.range.gte == datetime(2025, 1, 1, 12, 0, 0, tzinfo=timezone.utc)
+
+
+def test_recency_formula_blends_score_and_decay():
+    query = build_recency_formula(half_life_hours=2, recency_weight=0.25, decay="gauss", now=NOW)
+    similarity, recency = query.formula.sum
+    assert similarity.mult == [0.75, "$score"]
+    assert recency.mult[0] == 0.25
+    params = recency.mult[1].gauss_decay
+    assert params.scale == 7200.0
+    assert params.midpoint == 0.5
+    assert params.x.datetime_key == TIMESTAMP_FIELD
+    assert query.defaults == {TIMESTAMP_FIELD: MISSING_TIMESTAMP_DEFAULT}
+
+
+@pytest.mark.parametrize("kwargs", [
+    {"half_life_hours": 0},
+    {"recency_weight": 1.5},
+    {"decay": "linear"},
+])
+def test_recency_formula_rejects_bad_params(kwargs):
+    with pytest.raises(ValueError):
+        build_recency_formula(**kwargs)
+
+
+def test_recency_query_kwargs_prefetches_within_window():
+    kwargs = recency_query_kwargs([0.1, 0.2], limit=5, candidate_limit=100, max_age_hours=48)
+    assert kwargs["limit"] == 5
+    assert isinstance(kwargs["prefetch"], models.Prefetch)
+    assert kwargs["prefetch"].limit == 100
+    assert kwargs["prefetch"].filter.must[0].key == TIMESTAMP_FIELD
+    assert isinstance(kwargs["query"], models.FormulaQuery)
+
+
+# ------------------------------
+# hybrid_search ranking, end to end through local Qdrant
+# ------------------------------
+AGES_H = {"old": 100, "mid": 2, "fresh": 1}
+VECTORS = {"old": [1.0, 0.0], "mid": [0.8, 0.6], "fresh": [0.6, 0.8]}
+
+
+class StubQueryEmbedder:
+    def embed(self, text, timeout=None):
+        return np.array([1.0, 0.0])  # most similar to "old", least to "fresh"
+
+
+@pytest.fixture
+def tweets_client(monkeypatch):
+    monkeypatch.setattr(text_embeddings, "get_query_embedder", lambda model_name: StubQueryEmbedder())
+    client = QdrantClient(":memory:")
+    client.create_collection("tweets", vectors_config=models.VectorParams(size=2, distance=models.Distance.COSINE))
+    now = datetime.now(timezone.utc)
+    client.upsert("tweets", points=[
+        models.PointStruct(id=i, vector=VECTORS[name], payload={
+            "document": name,
+            "latitude": 40.7,
+            "longitude": -73.9,
+            TIMESTAMP_FIELD: to_rfc3339(now - timedelta(hours=AGES_H[name])),
+        })
+        for i, name in enumerate(VECTORS, start=1)
+    ])
+    return client
+
+
+def search(client, **kwargs):
+    return text_embeddings.hybrid_search(
+        client=client, collection_name="tweets", query_lat=40.7, query_lon=-73.9, radius_km=10, **kwargs
+    )
+
+
+def docs(hits):
+    return [h["document"] for h in hits]
+
+
+def test_hybrid_search_text_path_ranks_by_recency(tweets_client):
+    hits = search(tweets_client, text_query="anything", recency_weight=1.0)
+    assert docs(hits) == ["fresh", "mid", "old"]
+    scores = [h["score"] for h in hits]
+    assert scores[0] == pytest.approx(0.5 ** (1 / 24), abs=1e-3)
+    assert scores[2] == pytest.approx(0.5 ** (100 / 24), abs=1e-3)
+
+
+def test_hybrid_search_text_path_zero_weight_is_similarity(tweets_client):
+    hits = search(tweets_client, text_query="anything", recency_weight=0.0)
+    assert docs(hits) == ["old", "mid", "fresh"]
+    assert [h["score"] for h in hits] == pytest.approx([1.0, 0.8, 0.6], abs=1e-4)
+
+
+def test_hybrid_search_text_path_window_drops_old(tweets_client):
+    hits = search(tweets_client, text_query="anything", recency_weight=0.0, max_age_hours=10)
+    assert docs(hits) == ["mid", "fresh"]
+
+
+def test_hybrid_search_location_path_ranks_by_recency(tweets_client):
+    out = search(tweets_client, recency_weight=1.0)
+    assert docs(out["similar_texts_by_vector"]) == ["fresh", "mid", "old"]
+
+    out = search(tweets_client, recency_weight=0.0)
+    centroid = np.mean(list(VECTORS.values()), axis=0)
+    by_cosine = sorted(VECTORS, key=lambda n: -np.dot(VECTORS[n], centroid) / np.linalg.norm(VECTORS[n]))
+    assert docs(out["similar_texts_by_vector"]) == by_cosine
+
+    out = search(tweets_client, recency_weight=1.0, max_age_hours=10)
+    assert sorted(docs(out["nearest_by_location"])) == ["fresh", "mid"]
+    assert docs(out["similar_texts_by_vector"]) == ["fresh", "mid"]
+
+
+def test_hybrid_search_window_on_untimestamped_collection_is_empty(monkeypatch):
+    monkeypatch.setattr(text_embeddings, "get_query_embedder", lambda model_name: StubQueryEmbedder())
+    client = QdrantClient(":memory:")
+    client.create_collection("tweets", vectors_config=models.VectorParams(size=2, distance=models.Distance.COSINE))
+    client.upsert("tweets", points=[
+        models.PointStruct(id=1, vector=[1.0, 0.0], payload={"document": "legacy", "latitude": 40.7, "longitude": -73.9})
+    ])
+    assert search(client, text_query="anything", max_age_hours=10) == []
+    assert search(client, max_age_hours=10) == []
+    assert docs(search(client, text_query="anything")) == ["legacy"]